@@ -2,6 +2,7 @@
 itself is of the type Node3D and can be added to the scene graph. """
 import math
 
+import numpy as np
 import pyrr
 from pyrr import Matrix44
 
@@ -14,11 +15,25 @@ class Camera(Node3D):
 
     def __init__(self):
         """Base class of all camera types used in pysg."""
+        self._version = 0
+        """ int: Incremented whenever the world or the projection matrix of the camera changes."""
+        self.__world_matrix = None
 
         super().__init__()
         self.__projection_matrix = pyrr.Matrix44()
         self._need_matrix_update = True
 
+    @property
+    def _world_matrix(self) -> Matrix44:
+        return self.__world_matrix
+
+    @_world_matrix.setter
+    def _world_matrix(self, world_matrix: Matrix44) -> None:
+        if world_matrix is not self.__world_matrix \
+                and (self.__world_matrix is None or not np.array_equal(world_matrix, self.__world_matrix)):
+            self._version += 1
+        self.__world_matrix = world_matrix
+
     @property
     def projection_matrix(self) -> Matrix44:
         """ The current projection matrix of the camera.
@@ -33,6 +48,7 @@ class Camera(Node3D):
         if self._need_matrix_update:
             self._need_matrix_update = False
             self.__projection_matrix = self._compute_projection_matrix()
+            self._version += 1
         return self.__projection_matrix
 
     def _compute_projection_matrix(self) -> Matrix44:
@@ -48,6 +48,7 @@ world coordinates [3,1,1].
 """
 from copy import copy
 
+import numpy as np
 from pyrr import Matrix44, Vector3, Quaternion
 
 from pysg.pyrr_extensions import compose_matrix, quaternion_to_euler_angles, euler_angles_to_quaternion
@@ -68,6 +69,7 @@ class Node3D:
 
         self._local_position = Vector3()
         self._world_position = Vector3()
+        self._world_position_tuple = None
 
         self._scale = Vector3([1., 1., 1.])
 
@@ -94,6 +96,7 @@ class Node3D:
         if parent is None:
             # If parent is set to None local and world transform are the same
             self._world_position = self._local_position
+            self._world_position_tuple = None
             self._world_quaternion = self._local_quaternion
         else:
             # If new root node is added the local transform will be set relative to new root node
@@ -142,11 +145,27 @@ class Node3D:
         world_position = pyrr_type_checker(world_position, Vector3)
         self.__matrix_needs_update = True
         self._world_position = world_position
+        self._world_position_tuple = None
         if self._parent is None:
             self._local_position = world_position
         for child in self.children:
             child.world_position = child.local_position + self._world_position
 
+    @property
+    def world_position_tuple(self) -> tuple:
+        """ The world position of a node as tuple of floats (read only).
+
+        The tuple is cached until the world position changes. Use it if the position is needed as plain
+        tuple, for example as value of a shader uniform.
+
+        Returns:
+            tuple: Position of node in world space.
+
+        """
+        if self._world_position_tuple is None:
+            self._world_position_tuple = tuple(self._world_position.tolist())
+        return self._world_position_tuple
+
     @property
     def local_quaternion(self):
         """ The local rotation as quaternion.
@@ -330,7 +349,8 @@ class Node3D:
         if self._parent is None:
             self._world_matrix = self.local_matrix
         else:
-            self._world_matrix = self.parent.world_matrix * self.local_matrix
+            # Equals parent.world_matrix * local_matrix in pyrr notation
+            self._world_matrix = np.matmul(self.local_matrix, self.parent.world_matrix).view(Matrix44)
 
         for child in self.children:
             child.update_world_matrix()
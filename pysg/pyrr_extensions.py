@@ -1,9 +1,22 @@
 """ Contains some functions which extend the pyrr math lib."""
 import math
+from typing import Union
 
 import numpy as np
 from pyrr import Matrix44, Quaternion, Vector3
-from pyrr.utils import parameters_as_numpy_arrays
+
+
+# Lower and upper angle limit for (in_degrees, allow_negative, limit_to_circle)
+_ANGLE_LIMITS = {
+    (True, True, True): (-360.0, 360.0),
+    (True, False, True): (0.0, 360.0),
+    (False, True, True): (-2 * math.pi, 2 * math.pi),
+    (False, False, True): (0.0, 2 * math.pi),
+    (True, True, False): (-math.inf, math.inf),
+    (True, False, False): (0.0, math.inf),
+    (False, True, False): (-math.inf, math.inf),
+    (False, False, False): (0.0, math.inf),
+}
 
 
 def is_angle(angle, *, in_degrees, allow_negative, limit_to_circle):
@@ -19,12 +32,7 @@ def is_angle(angle, *, in_degrees, allow_negative, limit_to_circle):
         bool: True for valid angle, False otherwise.
 
     """
-    if limit_to_circle:
-        upper_limit = 360.0 if in_degrees else 2 * math.pi
-        lower_limit = -360.0 if allow_negative else 0.0
-    else:
-        upper_limit = math.inf
-        lower_limit = -math.inf if allow_negative else 0.0
+    lower_limit, upper_limit = _ANGLE_LIMITS[bool(in_degrees), bool(allow_negative), bool(limit_to_circle)]
     return lower_limit <= angle <= upper_limit
 
 
@@ -39,16 +47,120 @@ def compose_matrix(position: Vector3, quaternion: Quaternion, scale: Vector3) ->
         scale: Scale of object (x, y, and z) as Vector3.
     """
 
-    translation_matrix = Matrix44([[1., 0., 0., 0.],
-                                   [0., 1., 0., 0.],
-                                   [0., 0., 1., 0.],
-                                   [position[0], position[1], position[2], 1.]])
-    rotation_matrix = quaternion.matrix44
-    scale_matrix = Matrix44([[scale[0], 0., 0., 0.0],
-                             [0., scale[1], 0., 0.0],
-                             [0., 0., scale[2], 0.0],
-                             [0., 0., 0., 1.]])
-    return translation_matrix * rotation_matrix * scale_matrix
+    # The result equals translation * rotation * scale. Since all three matrices are known, the TRS matrix
+    # is written directly instead of doing two general 4x4 multiplications.
+    return Matrix44(compose_matrix_batch(np.asarray(position)[np.newaxis],
+                                         np.asarray(quaternion)[np.newaxis],
+                                         np.asarray(scale)[np.newaxis])[0])
+
+
+def quat_to_rot3_batch(quaternions: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """ Convert several quaternions to 3x3 rotation matrices in one vectorized pass.
+
+    The result equals the rotation part of Quaternion.matrix44. See:
+    http://www.euclideanspace.com/maths/geometry/rotations/conversions/quaternionToMatrix/index.htm
+
+    Args:
+        quaternions: Rotations as quaternions in x, y, z, w order with shape (N, 4).
+        out: Optional array of shape (N, 3, 3) the result is written to.
+
+    Returns:
+        np.ndarray: Float32 rotation matrices of shape (N, 3, 3) in the OpenGL column first layout.
+    """
+    quaternions = np.asarray(quaternions, dtype=np.float32)
+    if out is None:
+        out = np.empty((len(quaternions), 3, 3), dtype=np.float32)
+    x, y, z, w = quaternions[:, 0], quaternions[:, 1], quaternions[:, 2], quaternions[:, 3]
+    xx = x * x
+    yy = y * y
+    zz = z * z
+    ww = w * w
+    xy = x * y
+    xz = x * z
+    yz = y * z
+    xw = x * w
+    yw = y * w
+    zw = z * w
+    inverse_norm = 1. / (xx + yy + zz + ww)
+    two_inverse_norm = 2. * inverse_norm
+
+    out[:, 0, 0] = (xx - yy - zz + ww) * inverse_norm
+    out[:, 0, 1] = (xy - zw) * two_inverse_norm
+    out[:, 0, 2] = (xz + yw) * two_inverse_norm
+    out[:, 1, 0] = (xy + zw) * two_inverse_norm
+    out[:, 1, 1] = (-xx + yy - zz + ww) * inverse_norm
+    out[:, 1, 2] = (yz - xw) * two_inverse_norm
+    out[:, 2, 0] = (xz - yw) * two_inverse_norm
+    out[:, 2, 1] = (yz + xw) * two_inverse_norm
+    out[:, 2, 2] = (-xx - yy + zz + ww) * inverse_norm
+    return out
+
+
+def compose_matrix_batch(positions: np.ndarray, quaternions: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """ Reconstruct several 4x4 matrices from rotation, position and scale in one vectorized pass.
+
+    Same as compose_matrix, but for arrays of transforms.
+
+    Args:
+        positions: Positions in 3D space with shape (N, 3).
+        quaternions: Rotations as quaternions in x, y, z, w order with shape (N, 4).
+        scales: Scales of objects (x, y, and z) with shape (N, 3).
+
+    Returns:
+        np.ndarray: Float32 array of shape (N, 4, 4) in the OpenGL column first layout.
+    """
+    matrices = np.empty((len(quaternions), 4, 4), dtype=np.float32)
+    rotations = quat_to_rot3_batch(quaternions, out=matrices[:, :3, :3])
+    # Row i of the rotation is scaled by scale i
+    rotations *= np.asarray(scales, dtype=np.float32)[:, :, np.newaxis]
+    matrices[:, :3, 3] = 0.
+    matrices[:, 3, :3] = positions
+    matrices[:, 3, 3] = 1.
+    return matrices
+
+
+def has_orthogonal_rows(matrix: Matrix44, epsilon: float = 1e-5) -> bool:
+    """ Check whether the rows of the 3x3 rotation and scale part of a transformation matrix are orthogonal.
+
+    This is the case for all translation, rotation and scale matrices without shear. Shear appears for example
+    if a rotated node is the child of a node with non-uniform scale.
+
+    Args:
+        matrix: Transformation matrix in the OpenGL column first layout.
+        epsilon (float): Wiggle factor relative to the squared scale.
+
+    Returns:
+        bool: True if the rows are orthogonal. False if not.
+    """
+    rotation_scale = np.asarray(matrix)[:3, :3]
+    gram = rotation_scale @ rotation_scale.T
+    squared_scale = np.diagonal(gram)
+    return np.allclose(gram, np.diag(squared_scale), rtol=0., atol=epsilon * np.max(squared_scale))
+
+
+def affine_inverse(matrix: Matrix44, out: np.ndarray = None) -> Matrix44:
+    """ Invert a 4x4 transformation matrix composed of translation, rotation and scale.
+
+    Instead of the general 4x4 inverse the structure of the matrix is used: The inverse of the rotation part is
+    its transpose divided by the squared scale and the inverse translation is the negated translation transformed
+    by this inverse. The matrix must not contain a projection or shear, see has_orthogonal_rows.
+
+    Args:
+        matrix: Transformation matrix in the OpenGL column first layout.
+        out: Optional 4x4 array the result is written to.
+
+    Returns:
+        Matrix44: The inverse transformation matrix. If out is given, out is returned instead.
+    """
+    matrix = np.asarray(matrix)
+    rotation_scale = matrix[:3, :3]
+    inverse_rotation_scale = rotation_scale.T / np.einsum('ij,ij->i', rotation_scale, rotation_scale)
+    inverse = np.empty((4, 4), dtype=matrix.dtype) if out is None else out
+    inverse[:3, :3] = inverse_rotation_scale
+    inverse[:3, 3] = 0.
+    inverse[3, :3] = -matrix[3, :3] @ inverse_rotation_scale
+    inverse[3, 3] = 1.
+    return Matrix44(inverse) if out is None else out
 
 
 def quaternion_are_equal(q1: Quaternion, q2: Quaternion, epsilon: float = 1e-12) -> bool:
@@ -64,21 +176,54 @@ def quaternion_are_equal(q1: Quaternion, q2: Quaternion, epsilon: float = 1e-12)
         bool: True if both are equal. False if not.
     """
 
-    return math.fabs(q1.dot(q2)) > 1 - epsilon
+    dot = q1[0] * q2[0] + q1[1] * q2[1] + q1[2] * q2[2] + q1[3] * q2[3]
+    return (dot if dot >= 0. else -dot) > 1. - epsilon
 
 
 # From http://www.euclideanspace.com/maths/geometry/rotations/conversions/quaternionToAngle/
-def quaternion_to_euler_angles(quaternion: Quaternion) -> Vector3:
-    """ Converts quaternion to euler angles in degrees and YZX order.
+def quaternion_to_euler_angles(quaternion: Union[Quaternion, np.ndarray]) -> Union[Vector3, np.ndarray]:
+    """ Converts one or several quaternions to euler angles in degrees and YZX order.
 
     First heading, then attitude, then bank. See also:
     http://www.euclideanspace.com/maths/geometry/rotations/euler/index.htm
     and:
     http://www.euclideanspace.com/maths/geometry/rotations/conversions/quaternionToEuler/index.htm
 
+    Args:
+        quaternion: A single Quaternion or an array of shape (N, 4) in x, y, z, w order.
+
     Returns:
-        Vector3: Vector3 representation of quaternion
+        Vector3 representation of a single quaternion, otherwise an array of shape (N, 3).
     """
+    if np.ndim(quaternion) == 1:
+        if not isinstance(quaternion, Quaternion):
+            quaternion = Quaternion(quaternion)
+        return _quaternion_to_euler_angles(quaternion)
+
+    quaternions = np.asarray(quaternion)
+    x, y, z, w = quaternions[:, 0], quaternions[:, 1], quaternions[:, 2], quaternions[:, 3]
+    sqw = w * w
+    sqx = x * x
+    sqy = y * y
+    sqz = z * z
+    unit = sqx + sqy + sqz + sqw  # if normalised is one, otherwise is correction factor
+    test = x * y + z * w
+    north = test > 0.499 * unit  # singularity at north pole
+    south = test < -0.499 * unit  # singularity at south pole
+
+    pole_heading = 2 * np.arctan2(x, w)
+    heading = np.where(north, pole_heading, np.where(
+        south, -pole_heading, np.arctan2(2 * y * w - 2 * x * z, sqx - sqy - sqz + sqw)))
+    attitude = np.where(north, math.pi / 2., np.where(
+        south, -math.pi / 2., np.arcsin(np.clip(2 * test / unit, -1., 1.))))
+    bank = np.where(north | south, 0., np.arctan2(2 * x * w - 2 * y * z, -sqx + sqy - sqz + sqw))
+
+    result = np.stack([bank, heading, attitude], axis=-1)
+    return np.rad2deg(result, out=result)
+
+
+def _quaternion_to_euler_angles(quaternion: Quaternion) -> Vector3:
+    """ Scalar version of quaternion_to_euler_angles for a single quaternion."""
     sqw = quaternion.w * quaternion.w
     sqx = quaternion.x * quaternion.x
     sqy = quaternion.y * quaternion.y
@@ -100,35 +245,41 @@ def quaternion_to_euler_angles(quaternion: Quaternion) -> Vector3:
     return Vector3(np.rad2deg([bank, heading, attitude]))
 
 
-@parameters_as_numpy_arrays('eulers')
 def euler_angles_to_quaternion(eulers, dtype=None):
-    """Creates a quaternion from a set of Euler angles.
+    """Creates quaternions from one or several sets of Euler angles.
 
-    Rotation order for euler angles is YZX.
+    Rotation order for euler angles is YZX. All sines and cosines are evaluated in one vectorized pass
+    over the stacked half angles.
 
     See: http://www.euclideanspace.com/maths/geometry/rotations/conversions/eulerToQuaternion/index.htm
 
+    Args:
+        eulers: Euler angles in radians. Either a single vector of length 3 or an array of shape (N, 3).
+        dtype: Data type of the result. Defaults to the data type of the input.
+
+    Returns:
+        Quaternion for a single set of euler angles, otherwise an array of shape (N, 4) in x, y, z, w order.
     """
+    eulers = np.asarray(eulers)
     dtype = dtype or eulers.dtype
+    single = eulers.ndim == 1
+    eulers = eulers.reshape(-1, 3)
 
-    heading_half = eulers[1] / 2.
-    attitude_half = eulers[2] / 2.
-    bank_half = eulers[0] / 2.
-
-    c1 = np.math.cos(heading_half)
-    s1 = np.math.sin(heading_half)
-    c2 = np.math.cos(attitude_half)
-    s2 = np.math.sin(attitude_half)
-    c3 = np.math.cos(bank_half)
-    s3 = np.math.sin(bank_half)
+    # Heading, attitude, bank
+    half = eulers[:, [1, 2, 0]] * 0.5
+    c = np.cos(half)
+    s = np.sin(half)
+    c1, c2, c3 = c[:, 0], c[:, 1], c[:, 2]
+    s1, s2, s3 = s[:, 0], s[:, 1], s[:, 2]
     c1c2 = c1 * c2
     s1s2 = s1 * s2
-    return Quaternion(
-        [
-            c1c2 * s3 + s1s2 * c3,
-            s1 * c2 * c3 + c1 * s2 * s3,
-            c1 * s2 * c3 - s1 * c2 * s3,
-            c1c2 * c3 - s1s2 * s3,
-        ],
-        dtype=dtype
-    )
+    quaternions = np.stack([
+        c1c2 * s3 + s1s2 * c3,
+        s1 * c2 * c3 + c1 * s2 * s3,
+        c1 * s2 * c3 - s1 * c2 * s3,
+        c1c2 * c3 - s1s2 * s3,
+    ], axis=-1).astype(dtype, copy=False)
+
+    if single:
+        return Quaternion(quaternions[0], dtype=dtype)
+    return quaternions
@@ -4,15 +4,53 @@ in *pysg*."""
 import os
 
 import moderngl as mgl
+import numpy as np
 
 from pysg.camera import Camera
 from pysg.geometry import create_cube, create_plane, create_icosahedron, create_circle, create_triangle, \
     create_cylinder, create_tetrahedral, create_pyramid
 from pysg.object_3d import PlaneObject3D, IcosahedronObject3D, CubeObject3D, CircleObject3D, TriangleObject3D, \
     CylinderObject3D, TetrahedralObject3D, PyramidObject3D
+from pysg.pyrr_extensions import affine_inverse, has_orthogonal_rows
 from pysg.scene import Scene
 
 
+def _geometry_bytes(vertices, indices, normals):
+    """ Convert geometry arrays to the raw bytes uploaded to the GPU."""
+    return vertices.astype('f4').tobytes(), indices.astype('i4').tobytes(), normals.astype('f4').tobytes()
+
+
+def _read_shader(file_name):
+    """ Read the source code of a shader shipped with pysg."""
+    with open(os.path.join(_SHADER_DIR, file_name)) as f:
+        return f.read()
+
+
+# Maximum number of instances per draw call. Defined as MAX_INSTANCES in the vertex shader.
+_MAX_INSTANCES = 128
+# Host side layout of the std140 'Instances' uniform block of simple.vert
+_INSTANCE_BLOCK = np.dtype([
+    ('model_matrices', np.float32, (_MAX_INSTANCES, 4, 4)),
+    ('model_sizes', np.float32, (_MAX_INSTANCES, 4)),
+    ('object_colors', np.float32, (_MAX_INSTANCES, 4)),
+])
+
+_SHADER_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'shader')
+_VERTEX_SHADER = _read_shader('simple.vert').replace(
+    '\n', '\n#define MAX_INSTANCES %d\n' % _MAX_INSTANCES, 1)
+_FRAGMENT_SHADER = _read_shader('simple.frag')
+
+# Geometry data is the same for every renderer. Create it only once per process.
+_CUBE = _geometry_bytes(*create_cube())
+_PLANE = _geometry_bytes(*create_plane())
+_ICOSAHEDRON = _geometry_bytes(*create_icosahedron())
+_CIRCLE = _geometry_bytes(*create_circle())
+_TRIANGLE = _geometry_bytes(*create_triangle())
+_CYLINDER = _geometry_bytes(*create_cylinder())
+_TETRAHEDRAL = _geometry_bytes(*create_tetrahedral())
+_PYRAMID = _geometry_bytes(*create_pyramid())
+
+
 class Renderer:
 
     def __init__(self, scene: Scene, camera: Camera):
@@ -35,11 +73,16 @@ class Renderer:
                
         See https://moderngl.readthedocs.io/en/stable/reference/context.html for more information.
         """
+        # Persistent float32 buffers which are uploaded as uniforms. Avoids allocations for every frame.
+        self._view_scratch = np.empty((4, 4), dtype=np.float32)
+        self._view_projection_scratch = np.empty((4, 4), dtype=np.float32)
+        self._cached_camera = None
+        self._camera_version = None
 
     def _create_vertex_array(self, vertices, indices, normals):
-        vbo = self.ctx.buffer(vertices.astype('f4').tobytes())
-        ibo = self.ctx.buffer(indices.astype('i4').tobytes())
-        nbo = self.ctx.buffer(normals.astype('f4').tobytes())
+        vbo = self.ctx.buffer(vertices)
+        ibo = self.ctx.buffer(indices)
+        nbo = self.ctx.buffer(normals)
         vao_content = [
             (vbo, '3f', 'in_vert'),
             (nbo, '3f', 'in_norm')
@@ -52,26 +95,36 @@ class Renderer:
         self.ctx.enable(mgl.CULL_FACE)
         self.ctx.front_face = 'ccw'
         self.ctx.enable(mgl.DEPTH_TEST)
-        shader_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'shader')
-        self.prog = self.ctx.program(
-            vertex_shader=open(os.path.join(shader_path, 'simple.vert')).read(),
-            fragment_shader=open(os.path.join(shader_path, 'simple.frag')).read())
-        self.object_color = self.prog['ObjectColor']
+        self.prog = self.ctx.program(vertex_shader=_VERTEX_SHADER, fragment_shader=_FRAGMENT_SHADER)
         self.ambient_light = self.prog['AmbientLight']
         self.point_light_position = self.prog['PointLightPosition']
         self.point_light_color = self.prog['PointLightColor']
-        self.model_matrix = self.prog['ModelMatrix']
         self.view_projection_matrix = self.prog['ViewProjectionMatrix']
-        self.model_size = self.prog['ModelSize']
-
-        self.cube_vao = self._create_vertex_array(*create_cube())
-        self.plane_vao = self._create_vertex_array(*create_plane())
-        self.icosahedron_vao = self._create_vertex_array(*create_icosahedron())
-        self.circle_vao = self._create_vertex_array(*create_circle())
-        self.triangle_vao = self._create_vertex_array(*create_triangle())
-        self.cylinder_vao = self._create_vertex_array(*create_cylinder())
-        self.tetrahedral_vao = self._create_vertex_array(*create_tetrahedral())
-        self.pyramid_vao = self._create_vertex_array(*create_pyramid())
+        self.prog['Instances'].binding = 0
+
+        # Per instance data of all objects. One block of _MAX_INSTANCES objects per draw call.
+        self._instance_blocks = np.zeros(1, dtype=_INSTANCE_BLOCK)
+        self._instance_buffer = self.ctx.buffer(reserve=_INSTANCE_BLOCK.itemsize, dynamic=True)
+
+        self.cube_vao = self._create_vertex_array(*_CUBE)
+        self.plane_vao = self._create_vertex_array(*_PLANE)
+        self.icosahedron_vao = self._create_vertex_array(*_ICOSAHEDRON)
+        self.circle_vao = self._create_vertex_array(*_CIRCLE)
+        self.triangle_vao = self._create_vertex_array(*_TRIANGLE)
+        self.cylinder_vao = self._create_vertex_array(*_CYLINDER)
+        self.tetrahedral_vao = self._create_vertex_array(*_TETRAHEDRAL)
+        self.pyramid_vao = self._create_vertex_array(*_PYRAMID)
+
+        self._vertex_arrays = {
+            PlaneObject3D: (self.plane_vao, mgl.TRIANGLES),
+            IcosahedronObject3D: (self.icosahedron_vao, mgl.TRIANGLES),
+            CubeObject3D: (self.cube_vao, mgl.TRIANGLES),
+            CircleObject3D: (self.circle_vao, mgl.TRIANGLE_FAN),
+            TriangleObject3D: (self.triangle_vao, mgl.TRIANGLES),
+            CylinderObject3D: (self.cylinder_vao, mgl.TRIANGLES),
+            TetrahedralObject3D: (self.tetrahedral_vao, mgl.TRIANGLES),
+            PyramidObject3D: (self.pyramid_vao, mgl.TRIANGLES),
+        }
 
     def _render(self) -> None:
         """ Call this method from subclasses to render all objects in the scene.
@@ -85,38 +138,75 @@ class Renderer:
         if self.camera._parent is None:
             self.camera.update_world_matrix()
 
-        view_projection_mat44 = self.camera.projection_matrix * self.camera.world_matrix.inverse
-        self.view_projection_matrix.write(view_projection_mat44.astype('f4').tobytes())
+        self._update_view_projection_matrix()
+        self.view_projection_matrix.write(self._view_projection_scratch)
         self.ambient_light.value = self.scene.ambient_light
 
         # TODO implement several light sources and other types
         if len(self.scene.render_list.point_lights) > 0:
             self.point_light_color.value = self.scene.render_list.point_lights[0].color
-            self.point_light_position.value = tuple(self.scene.render_list.point_lights[0].world_position)
-
-        # Render 3D geometries
-        for object_3d in self.scene.render_list.geometry:
-            self.model_matrix.write(object_3d.world_matrix.astype('f4').tobytes())
-            self.object_color.value = object_3d.color
-            self.model_size.value = object_3d.size
-            if issubclass(type(object_3d), PlaneObject3D):
-                self.plane_vao.render(mgl.TRIANGLES)
-            elif issubclass(type(object_3d), IcosahedronObject3D):
-                self.icosahedron_vao.render(mgl.TRIANGLES)
-            elif issubclass(type(object_3d), CubeObject3D):
-                self.cube_vao.render(mgl.TRIANGLES)
-            elif issubclass(type(object_3d), CircleObject3D):
-                self.circle_vao.render(mgl.TRIANGLE_FAN)
-            elif issubclass(type(object_3d), TriangleObject3D):
-                self.triangle_vao.render(mgl.TRIANGLES)
-            elif issubclass(type(object_3d), CylinderObject3D):
-                self.cylinder_vao.render(mgl.TRIANGLES)
-            elif issubclass(type(object_3d), TetrahedralObject3D):
-                self.tetrahedral_vao.render(mgl.TRIANGLES)
-            elif issubclass(type(object_3d), PyramidObject3D):
-                self.pyramid_vao.render(mgl.TRIANGLES)
+            self.point_light_position.value = self.scene.render_list.point_lights[0].world_position_tuple
+
+        # Render 3D geometries. All per object data is uploaded with one buffer write. Afterwards all objects
+        # of the same type are drawn with one instanced draw call per block of _MAX_INSTANCES objects.
+        draw_calls = []
+        for object_3d_type, objects_3d in self.scene.render_list.geometry_by_type.items():
+            vao, mode = self._vertex_array_for_type(object_3d_type)
+            for start in range(0, len(objects_3d), _MAX_INSTANCES):
+                draw_calls.append((vao, mode, objects_3d[start:start + _MAX_INSTANCES]))
+
+        if len(draw_calls) > len(self._instance_blocks):
+            self._instance_blocks = np.zeros(len(draw_calls), dtype=_INSTANCE_BLOCK)
+            self._instance_buffer.release()
+            self._instance_buffer = self.ctx.buffer(reserve=self._instance_blocks.nbytes, dynamic=True)
+
+        for block, (_, _, objects_3d) in zip(self._instance_blocks, draw_calls):
+            count = len(objects_3d)
+            block['model_matrices'][:count] = [object_3d.world_matrix for object_3d in objects_3d]
+            block['model_sizes'][:count, :3] = [object_3d.size for object_3d in objects_3d]
+            block['object_colors'][:count, :3] = [object_3d.color for object_3d in objects_3d]
+        if draw_calls:
+            self._instance_buffer.write(self._instance_blocks[:len(draw_calls)])
+
+        for i, (vao, mode, objects_3d) in enumerate(draw_calls):
+            self._instance_buffer.bind_to_uniform_block(0, offset=i * _INSTANCE_BLOCK.itemsize,
+                                                        size=_INSTANCE_BLOCK.itemsize)
+            vao.render(mode, instances=len(objects_3d))
+
+    def _update_view_projection_matrix(self) -> None:
+        """ Recompute the view projection matrix if the camera was exchanged or changed since the last frame."""
+        projection_matrix = self.camera.projection_matrix
+        if self.camera is not self._cached_camera or self.camera._version != self._camera_version:
+            self._cached_camera = self.camera
+            self._camera_version = self.camera._version
+            # Equals projection_matrix * view_matrix in pyrr notation
+            world_matrix = self.camera.world_matrix
+            if has_orthogonal_rows(world_matrix):
+                affine_inverse(world_matrix, out=self._view_scratch)
+            else:
+                # Parents with non-uniform scale can shear the camera. Use the general inverse then.
+                self._view_scratch[...] = np.linalg.inv(world_matrix)
+            np.matmul(self._view_scratch, np.asarray(projection_matrix), out=self._view_projection_scratch)
+
+    def _vertex_array_for_type(self, object_3d_type: type) -> tuple:
+        """ Get the vertex array and render mode for a type of 3D object.
+
+        Args:
+            object_3d_type (type): Type of the 3D object which shall be rendered.
+
+        Returns:
+            tuple: Vertex array and render mode.
+        """
+        vertex_array = self._vertex_arrays.get(object_3d_type)
+        if vertex_array is None:
+            # Subclasses of the built-in 3D objects use the vertex array of their base class
+            for base in object_3d_type.__mro__[1:]:
+                if base in self._vertex_arrays:
+                    vertex_array = self._vertex_arrays[object_3d_type] = self._vertex_arrays[base]
+                    break
             else:
-                raise NotImplementedError(object_3d, "Renderer for object3D not implemented yet")
+                raise NotImplementedError(object_3d_type, "Renderer for object3D not implemented yet")
+        return vertex_array
 
     def render(self) -> None:
         """ Base render function which needs to be implemented by sub-classes."""
@@ -4,9 +4,13 @@
 All children added to this node can be rendered via a renderer.
 
 """
+import numpy as np
+from pyrr import Matrix44
+
 from pysg.constants import color
 from pysg.light import PointLight
 from pysg.node_3d import Node3D
+from pysg.pyrr_extensions import compose_matrix_batch
 
 
 class RenderLists:
@@ -14,6 +18,9 @@ class RenderLists:
     def __init__(self):
         """ Data object containing lights and geometry list for rendering. """
         self.geometry = list()
+        self.geometry_by_type = dict()
+        """ dict: The geometry list grouped by object type. Allows the renderer to bind each vertex array
+        only once per frame."""
         self.point_lights = list()
 
 
@@ -60,6 +67,7 @@ class Scene(Node3D):
                     print('Warning! Not more than one point light in a scene is possible right now.')
             else:
                 self.render_list.geometry.append(n)
+                self.render_list.geometry_by_type.setdefault(object_3d_type, list()).append(n)
 
         super(Scene, self).add(node_3d)
 
@@ -75,12 +83,53 @@ class Scene(Node3D):
                 self.render_list.point_lights.remove(n)
             else:
                 self.render_list.geometry.remove(n)
+                bucket = self.render_list.geometry_by_type[type(n)]
+                bucket.remove(n)
+                if not bucket:
+                    del self.render_list.geometry_by_type[type(n)]
 
         super().remove(node_3d)
 
+    def update_world_matrix(self) -> None:
+        """ Overrides base class of Node3D to update the world matrices of all nodes in one batch.
+
+        The local matrices of all nodes are computed in one vectorized pass. Afterwards the world matrices are
+        propagated through the scene graph level by level, with one matrix multiplication per level.
+        """
+        # Flatten scene graph in breadth first order. Every level of the graph is a contiguous range.
+        nodes = [self]
+        parents = [0]
+        levels = []
+        level_start = 0
+        while level_start < len(nodes):
+            level_end = len(nodes)
+            for i in range(level_start, level_end):
+                for child in nodes[i].children:
+                    nodes.append(child)
+                    parents.append(i)
+            if len(nodes) > level_end:
+                levels.append((level_end, len(nodes)))
+            level_start = level_end
+
+        local_matrices = compose_matrix_batch(np.array([n._local_position for n in nodes]),
+                                              np.array([n._local_quaternion for n in nodes]),
+                                              np.array([n._scale for n in nodes]))
+        world_matrices = np.empty_like(local_matrices)
+        if self._parent is None:
+            world_matrices[0] = local_matrices[0]
+        else:
+            np.matmul(local_matrices[0], self._parent.world_matrix, out=world_matrices[0])
+        parents = np.array(parents)
+        for start, end in levels:
+            np.matmul(local_matrices[start:end], world_matrices[parents[start:end]], out=world_matrices[start:end])
+
+        for node, world_matrix in zip(nodes, world_matrices):
+            node._world_matrix = world_matrix.view(Matrix44)
+
     def clear(self) -> None:
         """ Clears render lists and scene graph. """
 
         self.render_list.point_lights = list()
         self.render_list.geometry = list()
+        self.render_list.geometry_by_type = dict()
         self.children = list()
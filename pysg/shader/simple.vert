@@ -1,17 +1,26 @@
 #version 330
 
-uniform mat4 ModelMatrix;
+// MAX_INSTANCES is defined by renderer.py
+
+layout(std140) uniform Instances {
+    mat4 ModelMatrices[MAX_INSTANCES];
+    vec4 ModelSizes[MAX_INSTANCES];
+    vec4 ObjectColors[MAX_INSTANCES];
+};
+
 uniform mat4 ViewProjectionMatrix;
-uniform vec3 ModelSize;
 
 in vec3 in_vert;
 in vec3 in_norm;
 
-out vec3 v_vert;
+out vec3 v_position;
 out vec3 v_norm;
+flat out vec3 v_color;
 
 void main() {
-    gl_Position = ViewProjectionMatrix * ModelMatrix * vec4(in_vert * ModelSize, 1.0);
-    v_norm = in_norm;
-    v_vert = in_vert;
-}
\ No newline at end of file
+    mat4 modelMatrix = ModelMatrices[gl_InstanceID];
+    gl_Position = ViewProjectionMatrix * modelMatrix * vec4(in_vert * ModelSizes[gl_InstanceID].xyz, 1.0);
+    v_norm = transpose(inverse(mat3(modelMatrix))) * in_norm;
+    v_position = vec3(modelMatrix * vec4(in_vert, 1));
+    v_color = ObjectColors[gl_InstanceID].rgb;
+}
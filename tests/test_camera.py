@@ -66,3 +66,21 @@ class TestOrthographicCamera(TestCase):
             PerspectiveCamera(fov=45, aspect=0.2, near=-1, far=1)
         with self.assertRaises(Error):
             PerspectiveCamera(fov=45, aspect=0.2, near=0, far=-1)
+
+
+class TestCameraVersion(TestCase):
+
+    def test_version_static_camera(self):
+        camera = PerspectiveCamera(fov=45, aspect=1, near=0.1, far=100)
+        camera.update_world_matrix()
+        version = camera._version
+        camera.update_world_matrix()
+        self.assertEqual(camera._version, version)
+
+    def test_version_moved_camera(self):
+        camera = PerspectiveCamera(fov=45, aspect=1, near=0.1, far=100)
+        camera.update_world_matrix()
+        version = camera._version
+        camera.local_position = [0, 0, 5]
+        camera.update_world_matrix()
+        self.assertGreater(camera._version, version)
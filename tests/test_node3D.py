@@ -137,6 +137,21 @@ class TestNode3D(TestCase, CustomAssertions):
         np.testing.assert_almost_equal(np.array(self.child_1.world_position), np.array([2., 2., 2.]))
         np.testing.assert_almost_equal(np.array(self.child_2_1.world_position), np.array([2., 2., 2.]))
 
+    def test_world_position_tuple(self):
+        self.assertEqual(self.child_2_1.world_position_tuple, (0., 0., 0.))
+        self.root.local_position = Vector3([1., 2., 3.])
+        self.assertEqual(self.child_2_1.world_position_tuple, (1., 2., 3.))
+
+    def test_update_world_matrix(self):
+        self.root.local_position = Vector3([1., 2., 3.])
+        self.root.rotate_y(30)
+        self.child_2.local_position = Vector3([0., 1., 0.])
+        self.child_2.rotate_x(45)
+        self.root.update_world_matrix()
+        self.assertEqual(self.child_2.world_matrix.dtype, np.float32)
+        np.testing.assert_almost_equal(np.array(self.child_2.world_matrix),
+                                       np.array(self.root.local_matrix * self.child_2.local_matrix), decimal=5)
+
     def test_add_1(self):
         new_child = Node3D("new_child")
         self.root.add(new_child)
@@ -1,13 +1,23 @@
 from unittest import TestCase
 
 import numpy as np
-from pyrr import Quaternion, Vector3
+from pyrr import Matrix44, Quaternion, Vector3
 
-from pysg.pyrr_extensions import quaternion_are_equal, euler_angles_to_quaternion, quaternion_to_euler_angles
+from pysg.pyrr_extensions import quaternion_are_equal, euler_angles_to_quaternion, quaternion_to_euler_angles, \
+    compose_matrix, affine_inverse, has_orthogonal_rows, is_angle, quat_to_rot3_batch, compose_matrix_batch
+from pysg import Node3D
 from pysg.testing import CustomAssertions
 
 
 class TestPyrrExtensions(TestCase, CustomAssertions):
+    def test_is_angle(self):
+        self.assertTrue(is_angle(-180, in_degrees=True, allow_negative=True, limit_to_circle=True))
+        self.assertFalse(is_angle(-180, in_degrees=True, allow_negative=False, limit_to_circle=True))
+        self.assertFalse(is_angle(400, in_degrees=True, allow_negative=False, limit_to_circle=True))
+        self.assertTrue(is_angle(400, in_degrees=True, allow_negative=False, limit_to_circle=False))
+        self.assertFalse(is_angle(-7, in_degrees=False, allow_negative=True, limit_to_circle=True))
+        self.assertTrue(is_angle(-6, in_degrees=False, allow_negative=True, limit_to_circle=True))
+
     def test_quaternion_are_equal_1(self):
         self.assertTrue(quaternion_are_equal(Quaternion([1, 0, 0, 0]), Quaternion([-1, 0, 0, 0])))
 
@@ -36,6 +46,13 @@ class TestPyrrExtensions(TestCase, CustomAssertions):
         e = euler_angles_to_quaternion(v)
         self.assertQuaternionAreEqual(e, Quaternion([0.6903455, 0.5963678, -0.1530459, 0.3799282]), epsilon=1e-5)
 
+    def test_euler_to_quaternion_batch(self):
+        eulers = np.radians([[0, 0, 0], [0, 0, 180], [90, 70, 45]])
+        quaternions = euler_angles_to_quaternion(eulers)
+        self.assertEqual(quaternions.shape, (3, 4))
+        for euler, q in zip(eulers, quaternions):
+            self.assertQuaternionAreEqual(Quaternion(q), euler_angles_to_quaternion(euler))
+
     def test_quaternion_to_euler_1(self):
         q = Quaternion([0, 0, 0, 1])
         e = quaternion_to_euler_angles(q)
@@ -61,3 +78,60 @@ class TestPyrrExtensions(TestCase, CustomAssertions):
         q = Quaternion([0.3711136, 0.0742227, 0.519559, 0.7660444])
         e = quaternion_to_euler_angles(q)
         np.testing.assert_almost_equal(np.array(e), np.array([69.4060045, -31.1935729, 58.3315948]), decimal=5)
+
+    def test_quaternion_to_euler_batch(self):
+        quaternions = np.array([[0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0], [1, 0, 0, 0],
+                                [0.5, 0.5, 0.5, 0.5], [0.5, -0.5, 0.5, -0.5],
+                                [0.3711136, 0.0742227, 0.519559, 0.7660444]])
+        e = quaternion_to_euler_angles(quaternions)
+        self.assertEqual(e.shape, (7, 3))
+        for q, euler in zip(quaternions, e):
+            np.testing.assert_almost_equal(euler, np.array(quaternion_to_euler_angles(Quaternion(q))))
+
+    def test_compose_matrix(self):
+        position = Vector3([1., 2., 3.])
+        quaternion = euler_angles_to_quaternion(np.radians([30., 60., 45.]))
+        scale = Vector3([2., 3., 4.])
+        expected = Matrix44.from_translation(position) * quaternion.matrix44 * Matrix44.from_scale(scale)
+        np.testing.assert_almost_equal(np.array(compose_matrix(position, quaternion, scale)), np.array(expected),
+                                       decimal=5)
+
+    def test_affine_inverse(self):
+        quaternion = euler_angles_to_quaternion(np.radians([30., 60., 45.]))
+        matrix = compose_matrix(Vector3([1., -2., 3.]), quaternion, Vector3([2., 3., 4.]))
+        np.testing.assert_almost_equal(np.array(affine_inverse(matrix)), np.array(matrix.inverse), decimal=5)
+
+    def test_affine_inverse_sheared(self):
+        # Rotated child of a node with non-uniform scale
+        parent = Node3D()
+        parent.scale = Vector3([1., 2., 1.])
+        parent.rotate_z(30)
+        camera = Node3D()
+        camera.rotate_z(40)
+        parent.add(camera)
+        parent.update_world_matrix()
+        self.assertFalse(has_orthogonal_rows(camera.world_matrix))
+        self.assertTrue(has_orthogonal_rows(parent.world_matrix))
+        self.assertFalse(np.allclose(np.array(affine_inverse(camera.world_matrix)),
+                                     np.linalg.inv(camera.world_matrix), atol=1e-3))
+
+    def test_affine_inverse_out(self):
+        matrix = compose_matrix(Vector3([1., -2., 3.]), Quaternion(), Vector3([1., 1., 1.]))
+        out = np.empty((4, 4), dtype=np.float32)
+        self.assertIs(affine_inverse(matrix, out=out), out)
+        np.testing.assert_almost_equal(out, np.array(matrix.inverse), decimal=5)
+
+    def test_quat_to_rot3_batch(self):
+        quaternions = np.array([[0., 0., 0., 1.], [0.3, 0.2, -0.5, 0.9], [1., 2., 3., 4.]])
+        rotations = quat_to_rot3_batch(quaternions)
+        for q, rotation in zip(quaternions, rotations):
+            np.testing.assert_almost_equal(rotation, np.array(Quaternion(q).matrix33), decimal=5)
+
+    def test_compose_matrix_batch(self):
+        positions = np.array([[1., 2., 3.], [-1., 0., 5.]])
+        quaternions = np.array([[0.3, 0.2, -0.5, 0.9], [0., 0., 0., 1.]])
+        scales = np.array([[2., 3., 4.], [1., 1., 1.]])
+        matrices = compose_matrix_batch(positions, quaternions, scales)
+        for p, q, s, matrix in zip(positions, quaternions, scales, matrices):
+            expected = Matrix44.from_translation(p) * Quaternion(q).normalized.matrix44 * Matrix44.from_scale(s)
+            np.testing.assert_almost_equal(matrix, np.array(expected), decimal=5)
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+import numpy as np
+from pyrr import Vector3
+
+from pysg import Node3D, PerspectiveCamera, Scene
+from pysg.renderer import Renderer, _VERTEX_SHADER, _MAX_INSTANCES
+
+
+class TestRenderer(TestCase):
+
+    def test_view_projection_camera_swap(self):
+        camera_a = PerspectiveCamera(fov=45, aspect=1, near=0.1, far=100)
+        camera_b = PerspectiveCamera(fov=45, aspect=1, near=0.1, far=100)
+        camera_a.local_position = Vector3([0., 0., 5.])
+        camera_b.local_position = Vector3([50., 0., 5.])
+        camera_a.update_world_matrix()
+        camera_b.update_world_matrix()
+        renderer = Renderer(Scene(), camera_a)
+        renderer._update_view_projection_matrix()
+        view_projection_a = renderer._view_projection_scratch.copy()
+
+        camera_b.projection_matrix
+        # Equal versions must not hide the camera swap
+        self.assertEqual(camera_a._version, camera_b._version)
+        renderer.camera = camera_b
+        renderer._update_view_projection_matrix()
+        self.assertFalse(np.allclose(renderer._view_projection_scratch, view_projection_a))
+
+    def test_view_projection_sheared_camera(self):
+        parent = Node3D()
+        parent.scale = Vector3([1., 2., 1.])
+        parent.rotate_z(30)
+        camera = PerspectiveCamera(fov=45, aspect=1, near=0.1, far=100)
+        camera.rotate_z(40)
+        parent.add(camera)
+        parent.update_world_matrix()
+        renderer = Renderer(Scene(), camera)
+        renderer._update_view_projection_matrix()
+        expected = camera.projection_matrix * camera.world_matrix.inverse
+        np.testing.assert_almost_equal(renderer._view_projection_scratch, np.array(expected), decimal=5)
+
+    def test_vertex_shader_max_instances(self):
+        lines = _VERTEX_SHADER.splitlines()
+        self.assertTrue(lines[0].startswith('#version'))
+        self.assertEqual(lines[1], '#define MAX_INSTANCES %d' % _MAX_INSTANCES)
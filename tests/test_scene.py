@@ -1,6 +1,9 @@
 from unittest import TestCase
 
-from pysg import CubeObject3D, PointLight, Scene
+import numpy as np
+from pyrr import Quaternion, Vector3
+
+from pysg import CubeObject3D, Node3D, PointLight, Scene
 from pysg.testing import CustomAssertions
 
 
@@ -12,6 +15,7 @@ class TestScene(TestCase, CustomAssertions):
         cube = CubeObject3D(1, 1, 1)
         self.scene.add(cube)
         self.assertEqual(self.scene.render_list.geometry[0], cube)
+        self.assertEqual(self.scene.render_list.geometry_by_type[CubeObject3D], [cube])
 
     def test_add_2(self):
         light = PointLight(color=(1, 1, 1))
@@ -27,6 +31,7 @@ class TestScene(TestCase, CustomAssertions):
         self.scene.add(cube)
         self.scene.remove(cube)
         self.assertEqual(len(self.scene.render_list.geometry), 0)
+        self.assertEqual(len(self.scene.render_list.geometry_by_type), 0)
 
     def test_clear(self):
         cube = CubeObject3D(1, 1, 1)
@@ -34,3 +39,30 @@ class TestScene(TestCase, CustomAssertions):
         self.scene.clear()
         self.assertEqual(len(self.scene.render_list.geometry), 0)
         self.assertEqual(len(self.scene.children), 0)
+
+    def test_update_world_matrix(self):
+        group = Node3D()
+        group.local_position = Vector3([1., 2., 3.])
+        group.local_quaternion = Quaternion.from_y_rotation(0.5)
+        group.scale = Vector3([2., 2., 2.])
+        cube = CubeObject3D(1, 1, 1)
+        cube.local_position = Vector3([0., 1., 0.])
+        cube.local_quaternion = Quaternion.from_x_rotation(0.3)
+        group.add(cube)
+        self.scene.add(group)
+        self.scene.update_world_matrix()
+        expected = group.local_matrix * cube.local_matrix
+        np.testing.assert_almost_equal(np.array(cube.world_matrix), np.array(expected), decimal=5)
+
+    def test_update_world_matrix_parented_scene(self):
+        parent = Node3D()
+        parent.local_position = Vector3([1., 2., 3.])
+        parent.update_world_matrix()
+        cube = CubeObject3D(1, 1, 1)
+        cube.local_position = Vector3([0., 1., 0.])
+        self.scene.add(cube)
+        parent.add(self.scene)
+        self.scene.update_world_matrix()
+        # Adding the scene to the parent keeps its world transform, so the local matrix is non-trivial now
+        expected = parent.world_matrix * self.scene.local_matrix * cube.local_matrix
+        np.testing.assert_almost_equal(np.array(cube.world_matrix), np.array(expected), decimal=5)